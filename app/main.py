@@ -4,6 +4,7 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from starlette.middleware.sessions import SessionMiddleware
 import pandas as pd
+import numpy as np
 import os
 import uvicorn
 
@@ -66,25 +67,61 @@ def save_scheduled_id(patient_id, timestamp=None):
     with open(SCHEDULED_FILE, 'w') as f:
         json.dump(data, f)
 
-def load_data():
-    if os.path.exists(DATA_FILE):
+# Parsed patient data and its sorted Risk Scores, reused until DATA_FILE changes
+_data_cache = {'mtime': None, 'df': None, 'sorted_scores': None}
+
+def load_base_data():
+    """
+    Reads and parses DATA_FILE once, keeping an ascending array of Risk Scores
+    so that threshold changes never need a pass over the rows in Python.
+    """
+    mtime = os.path.getmtime(DATA_FILE)
+    if _data_cache['mtime'] != mtime:
         df = pd.read_csv(DATA_FILE)
         # Parse 'Symptoms' column from string representation to actual list
         if 'Symptoms' in df.columns:
             df['Symptoms'] = df['Symptoms'].apply(lambda x: ast.literal_eval(x) if isinstance(x, str) else [])
-        
-        # Recalculate Risk Category based on Settings
-        settings = load_settings()
-        high_thresh = int(settings.get('high_threshold', 90))
-        med_thresh = int(settings.get('medium_threshold', 50))
 
-        def calculate_risk(score):
-            if score >= high_thresh: return 'High'
-            if score >= med_thresh: return 'Medium'
-            return 'Low'
+        sorted_scores = np.array([], dtype=float)
+        if 'Risk Score' in df.columns:
+            # Missing scores never reach a threshold, so they always land in Low
+            scores = pd.to_numeric(df['Risk Score'], errors='coerce').to_numpy(dtype=float)
+            sorted_scores = np.sort(np.nan_to_num(scores, nan=-np.inf))
+
+        _data_cache.update({'mtime': mtime, 'df': df, 'sorted_scores': sorted_scores})
+    return _data_cache['df'], _data_cache['sorted_scores']
+
+def get_thresholds(settings):
+    high_thresh = int(settings.get('high_threshold', 90))
+    # A medium threshold above the high one leaves the Medium band empty
+    med_thresh = min(int(settings.get('medium_threshold', 50)), high_thresh)
+    return high_thresh, med_thresh
+
+def assign_risk_categories(scores, high_thresh, med_thresh):
+    """Maps scores to categories with a binary search against the two thresholds."""
+    scores = np.nan_to_num(np.asarray(scores, dtype=float), nan=-np.inf)
+    bands = np.searchsorted(np.array([med_thresh, high_thresh]), scores, side='right')
+    return np.array(['Low', 'Medium', 'High'])[bands]
+
+def count_risk_categories(sorted_scores, high_thresh, med_thresh):
+    """Counts High/Medium/Low patients from the sorted scores in O(log n)."""
+    below_med = int(np.searchsorted(sorted_scores, med_thresh, side='left'))
+    below_high = int(np.searchsorted(sorted_scores, high_thresh, side='left'))
+    return {
+        'high_risk': len(sorted_scores) - below_high,
+        'medium_risk': below_high - below_med,
+        'low_risk': below_med,
+    }
 
+def load_data():
+    if os.path.exists(DATA_FILE):
+        base_df, _ = load_base_data()
+        df = base_df.copy()
+
+        # Recalculate Risk Category based on Settings
+        high_thresh, med_thresh = get_thresholds(load_settings())
         if 'Risk Score' in df.columns:
-            df['Risk Category'] = df['Risk Score'].apply(calculate_risk)
+            df['Risk Category'] = assign_risk_categories(df['Risk Score'], high_thresh, med_thresh)
 
         # Merge Scheduled Status
         scheduled_data = load_scheduled_data()
@@ -133,11 +170,9 @@ async def dashboard(request: Request, page: int = 1):
 
     if not df.empty:
         # Calculate stats (global)
-        risk_counts = df['Risk Category'].value_counts().to_dict()
+        _, sorted_scores = load_base_data()
         stats['total'] = len(df)
-        stats['high_risk'] = risk_counts.get('High', 0)
-        stats['medium_risk'] = risk_counts.get('Medium', 0)
-        stats['low_risk'] = risk_counts.get('Low', 0)
+        stats.update(count_risk_categories(sorted_scores, *get_thresholds(settings)))
         
         # Filter by risk if needed
         # Note: We filter BEFORE pagination, but AFTER calculating global stats? 
@@ -217,6 +252,20 @@ async def update_settings_api(request: Request):
     save_settings(new_settings)
     return {"status": "success", "settings": load_settings()}
 
+@app.get("/api/settings/preview")
+async def preview_settings_api(high_threshold: int, medium_threshold: int):
+    """What-if counts for candidate thresholds, without saving them."""
+    high_thresh, med_thresh = get_thresholds({
+        'high_threshold': high_threshold,
+        'medium_threshold': medium_threshold
+    })
+    preview = {'total': 0, 'high_risk': 0, 'medium_risk': 0, 'low_risk': 0}
+    if os.path.exists(DATA_FILE):
+        _, sorted_scores = load_base_data()
+        preview['total'] = len(sorted_scores)
+        preview.update(count_risk_categories(sorted_scores, high_thresh, med_thresh))
+    return preview
+
 @app.get("/api/patients")
 async def get_patients():
     df = load_data()